@@ -0,0 +1,110 @@
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import random
+
+from part2 import (
+    group_totals, numpy_top_k, parallel_top_k, read_chunks,
+    stream_group_totals, top_k
+)
+
+
+# Inputs the synthetic inventory never has, checked before timing
+EDGE_CASES = [
+    '100 \n200\n\n300\n',
+    '100\r\n200\r\n\r\n300\r\n',
+    '100 200\n\n50\n',
+    '1\n\n\n\n2\n',
+    '7',
+    '',
+]
+
+
+def build_parser():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '--n-groups', type=int, default=1000000
+    )
+    parser.add_argument(
+        '--top', type=int, default=3
+    )
+    parser.add_argument(
+        '--workers', type=int, nargs='*', default=[1, 2, 4, 8]
+    )
+    parser.add_argument(
+        '--seed', type=int, default=2022
+    )
+
+    return parser
+
+
+def write_inventory(filename, n_groups, seed):
+    rng = random.Random(seed)
+    with open(filename, 'w') as fd:
+        for _ in range(n_groups):
+            n_items = rng.randint(1, 15)
+            fd.write('\n'.join(
+                str(rng.randint(1000, 60000)) for _ in range(n_items)
+            ))
+            fd.write('\n\n')
+
+
+def timed(function, *args):
+    start = perf_counter()
+    result = function(*args)
+
+    return perf_counter() - start, result
+
+
+def single_threaded(filename, k):
+    with open(filename) as fd:
+        return top_k(stream_group_totals(read_chunks(fd)), k)
+
+
+def check_edge_cases(directory, k):
+    filename = Path(directory) / 'edge_case.txt'
+    for data in EDGE_CASES:
+        filename.write_text(data)
+        expected = sum(sorted(group_totals(data))[::-1][:k])
+        for name, result in [
+            ('stream', single_threaded(filename, k)),
+            ('numpy', numpy_top_k(filename, k)),
+            ('workers', parallel_top_k(filename, k, 2)),
+        ]:
+            assert sum(result) == expected, (name, data, result, expected)
+
+
+def main():
+    args = build_parser().parse_args()
+
+    with TemporaryDirectory() as directory:
+        check_edge_cases(directory, args.top)
+
+        filename = Path(directory) / 'inventory.txt'
+        write_inventory(filename, args.n_groups, args.seed)
+        size_mb = filename.stat().st_size / 1e6
+        print(f'{args.n_groups} groups, {size_mb:.1f} MB')
+
+        baseline, expected = timed(single_threaded, filename, args.top)
+        print(f'single-threaded: {baseline:.2f}s')
+
+        elapsed, result = timed(numpy_top_k, filename, args.top)
+        assert result == expected, (result, expected)
+        print(
+            f'numpy: {elapsed:.2f}s, speedup {baseline / elapsed:.2f}x'
+        )
+
+        for workers in args.workers:
+            elapsed, result = timed(
+                parallel_top_k, filename, args.top, workers
+            )
+            assert result == expected, (result, expected)
+            print(
+                f'{workers} workers: {elapsed:.2f}s, '
+                f'speedup {baseline / elapsed:.2f}x'
+            )
+
+
+if __name__ == '__main__':
+    main()
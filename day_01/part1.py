@@ -1,7 +1,11 @@
 from argparse import ArgumentParser
+from heapq import nlargest
 from pathlib import Path
 
 
+CHUNK_SIZE = 1 << 20
+
+
 def build_parser():
     parser = ArgumentParser()
     parser.add_argument(
@@ -9,19 +13,78 @@ def build_parser():
         required=True
     )
 
+    parser.add_argument(
+        '--top', type=int, default=1
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help='Read the input in chunks rather than all at once'
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=CHUNK_SIZE
+    )
+
     return parser
 
 
+def group_totals(data):
+    return (
+        sum(int(calories) for calories in line.split())
+        for line in data.split('\n\n')
+    )
+
+
+def read_chunks(fd, chunk_size=CHUNK_SIZE, length=None):
+    while length is None or length > 0:
+        size = chunk_size if length is None else min(chunk_size, length)
+        chunk = fd.read(size)
+        if not chunk:
+            break
+        if length is not None:
+            length -= len(chunk)
+        yield chunk
+
+
+def stream_group_totals(chunks):
+    # Only the current group total and a partial trailing line are held,
+    #  so memory doesn't depend on the size of the input.
+    total = 0
+    in_group = False
+    remainder = ''
+    for chunk in chunks:
+        *lines, remainder = (remainder + chunk).split('\n')
+        for line in lines:
+            if line.strip():
+                total += sum(int(calories) for calories in line.split())
+                in_group = True
+            elif in_group:
+                yield total
+                total, in_group = 0, False
+
+    total += sum(int(calories) for calories in remainder.split())
+    if in_group or remainder.strip():
+        yield total
+
+
+def top_k(totals, k):
+    # nlargest keeps a heap of at most k items, rather than sorting everything.
+    return nlargest(k, totals)
+
+
 def main():
     args = build_parser().parse_args()
     with open(args.input_filename) as fd:
-        data = fd.read().split('\n\n')
-    print(
-        max(
-            sum(int(calories) for calories in line.split())
-            for line in data
-        )
-    )
+        if args.stream:
+            top_totals = top_k(
+                stream_group_totals(read_chunks(fd, args.chunk_size)),
+                args.top
+            )
+        else:
+            top_totals = sorted(
+                group_totals(fd.read())
+            )[::-1][:args.top]
+
+    print(sum(top_totals))
 
 
 if __name__ == '__main__':
@@ -1,6 +1,19 @@
 from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from heapq import nlargest
+from itertools import chain
+import os
 from pathlib import Path
 
+import numpy as np
+
+
+CHUNK_SIZE = 1 << 20
+NEWLINE = ord('\n')
+# Totals are int64, which holds any 18 digit integer
+MAX_DIGITS = 18
+WHITESPACE = np.frombuffer(b' \t\n\r\x0b\x0c', dtype=np.uint8)
+
 
 def build_parser():
     parser = ArgumentParser()
@@ -9,19 +22,191 @@ def build_parser():
         required=True
     )
 
+    parser.add_argument(
+        '--top', type=int, default=3
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help='Read the input in chunks rather than all at once'
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=CHUNK_SIZE
+    )
+    parser.add_argument(
+        '--numpy', action='store_true',
+        help='Parse the whole input as one array with NumPy'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help='Split the input at blank lines across this many processes'
+    )
+
     return parser
 
 
+def group_totals(data):
+    return (
+        sum(int(calories) for calories in line.split())
+        for line in data.split('\n\n')
+    )
+
+
+def read_chunks(fd, chunk_size=CHUNK_SIZE, length=None):
+    while length is None or length > 0:
+        size = chunk_size if length is None else min(chunk_size, length)
+        chunk = fd.read(size)
+        if not chunk:
+            break
+        if length is not None:
+            length -= len(chunk)
+        yield chunk
+
+
+def stream_group_totals(chunks):
+    # Only the current group total and a partial trailing line are held,
+    #  so memory doesn't depend on the size of the input.
+    total = 0
+    in_group = False
+    remainder = ''
+    for chunk in chunks:
+        *lines, remainder = (remainder + chunk).split('\n')
+        for line in lines:
+            if line.strip():
+                total += sum(int(calories) for calories in line.split())
+                in_group = True
+            elif in_group:
+                yield total
+                total, in_group = 0, False
+
+    total += sum(int(calories) for calories in remainder.split())
+    if in_group or remainder.strip():
+        yield total
+
+
+def numpy_group_totals(buffer):
+    # Tokens are runs of digits split on whitespace, as line.split() gives
+    #  them, and groups are split on blank lines, as data.split('\n\n').
+    digit = (buffer >= ord('0')) & (buffer <= ord('9'))
+    if not (digit | np.isin(buffer, WHITESPACE)).all():
+        raise ValueError('Expected whitespace separated integers')
+    if not digit.any():
+        return np.zeros(1, dtype=np.int64)
+
+    # Padding either side means every run of digits has a visible start
+    #  and end.
+    padded = np.concatenate([[False], digit, [False]])
+    starts = np.flatnonzero(padded[1:-1] & ~padded[:-2])
+    ends = np.flatnonzero(padded[1:-1] & ~padded[2:])
+    token_lengths = ends - starts + 1
+    if token_lengths.max() > MAX_DIGITS:
+        raise ValueError(f'Expected integers of at most {MAX_DIGITS} digits')
+
+    # Build every token's value a decimal place at a time, working back
+    #  from its last digit. Tokens are short, so this is only a handful of
+    #  passes.
+    token_values = np.zeros(ends.size, dtype=np.int64)
+    for place in range(token_lengths.max()):
+        digits = buffer[ends - place].astype(np.int64) - ord('0')
+        digits[token_lengths <= place] = 0
+        token_values += digits * 10 ** place
+
+    blank_lines = (buffer[:-1] == NEWLINE) & (buffer[1:] == NEWLINE)
+    blanks_before = np.concatenate([[0], np.cumsum(blank_lines)])[starts]
+    group_starts = np.flatnonzero(np.diff(blanks_before, prepend=-1))
+
+    return np.add.reduceat(token_values, group_starts)
+
+
+def numpy_top_k(filename, k):
+    # As with nlargest, no totals are asked for when k isn't positive
+    if k <= 0:
+        return []
+
+    totals = numpy_group_totals(np.fromfile(filename, dtype=np.uint8))
+    if k < totals.size:
+        totals = np.partition(totals, -k)[-k:]
+
+    return [int(total) for total in np.sort(totals)[::-1]]
+
+
+def top_k(totals, k):
+    # nlargest keeps a heap of at most k items, rather than sorting everything.
+    return nlargest(k, totals)
+
+
+def find_group_boundaries(filename, n_parts, chunk_size=CHUNK_SIZE):
+    # Nudge evenly spaced offsets forward to just past the next blank line,
+    #  so that no group straddles two parts.
+    file_size = os.path.getsize(filename)
+    boundaries = [0]
+    with open(filename, 'rb') as fd:
+        for part in range(1, n_parts):
+            offset = max(file_size * part // n_parts, boundaries[-1])
+            fd.seek(offset)
+            overlap = b''
+            for chunk in read_chunks(fd, chunk_size):
+                window = overlap + chunk
+                index = window.find(b'\n\n')
+                if index != -1:
+                    offset += index - len(overlap) + 2
+                    break
+                offset += len(chunk)
+                overlap = window[-1:]
+            boundaries.append(min(offset, file_size))
+    boundaries.append(file_size)
+
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def top_k_in_range(filename, start, end, k, chunk_size=CHUNK_SIZE):
+    with open(filename, 'rb') as fd:
+        fd.seek(start)
+        chunks = (
+            chunk.decode()
+            for chunk in read_chunks(fd, chunk_size, end - start)
+        )
+        return top_k(stream_group_totals(chunks), k)
+
+
+def parallel_top_k(filename, k, workers, chunk_size=CHUNK_SIZE):
+    ranges = [
+        (start, end)
+        for start, end in find_group_boundaries(filename, workers, chunk_size)
+        if end > start
+    ]
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [
+            executor.submit(
+                top_k_in_range, filename, start, end, k, chunk_size
+            )
+            for start, end in ranges
+        ]
+        partial_tops = [future.result() for future in futures]
+
+    return top_k(chain.from_iterable(partial_tops), k)
+
+
 def main():
     args = build_parser().parse_args()
-    with open(args.input_filename) as fd:
-        data = fd.read().split('\n\n')
-    print(
-        sum(sorted(
-            sum(int(calories) for calories in line.split())
-            for line in data
-        )[::-1][:3])
-    )
+    if args.numpy:
+        top_totals = numpy_top_k(args.input_filename, args.top)
+    elif args.workers:
+        top_totals = parallel_top_k(
+            args.input_filename, args.top, args.workers, args.chunk_size
+        )
+    else:
+        with open(args.input_filename) as fd:
+            if args.stream:
+                top_totals = top_k(
+                    stream_group_totals(read_chunks(fd, args.chunk_size)),
+                    args.top
+                )
+            else:
+                top_totals = sorted(
+                    group_totals(fd.read())
+                )[::-1][:args.top]
+
+    print(sum(top_totals))
 
 
 if __name__ == '__main__':
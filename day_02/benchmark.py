@@ -0,0 +1,79 @@
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import os
+import random
+import subprocess
+import sys
+
+
+ENGINES = ['replace', 'table', 'mmap']
+
+
+def build_parser():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '--n-rounds', type=int, default=10000000
+    )
+    parser.add_argument(
+        '--part', type=int, choices=[1, 2], default=1
+    )
+    parser.add_argument(
+        '--seed', type=int, default=2022
+    )
+
+    return parser
+
+
+def write_strategy_guide(filename, n_rounds, seed):
+    rng = random.Random(seed)
+    records = [
+        f'{opponent} {response}\n'.encode()
+        for opponent in 'ABC'
+        for response in 'XYZ'
+    ]
+    with open(filename, 'wb') as fd:
+        for start in range(0, n_rounds, 100000):
+            n_block = min(100000, n_rounds - start)
+            fd.write(b''.join(rng.choices(records, k=n_block)))
+
+
+def run_engine(script, filename, engine):
+    # Run each engine in its own process so that wait4 reports the peak
+    #  RSS of that engine alone.
+    start = perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, script, '-i', filename, '--engine', engine],
+        stdout=subprocess.PIPE
+    )
+    output = process.stdout.read()
+    _, _, usage = os.wait4(process.pid, 0)
+    elapsed = perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux
+    return int(output), elapsed, usage.ru_maxrss / 1024
+
+
+def main():
+    args = build_parser().parse_args()
+    script = Path(__file__).parent / f'part{args.part}.py'
+
+    with TemporaryDirectory() as directory:
+        filename = Path(directory) / 'strategy_guide.txt'
+        write_strategy_guide(filename, args.n_rounds, args.seed)
+        size_mb = filename.stat().st_size / 2 ** 20
+        print(f'{args.n_rounds} rounds, {size_mb:.1f} MiB')
+
+        scores = set()
+        for engine in ENGINES:
+            score, elapsed, peak_rss = run_engine(script, filename, engine)
+            scores.add(score)
+            print(
+                f'{engine}: {elapsed:.2f}s, peak RSS {peak_rss:.1f} MiB'
+            )
+        assert len(scores) == 1, scores
+
+
+if __name__ == '__main__':
+    main()
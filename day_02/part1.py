@@ -1,6 +1,13 @@
 from argparse import ArgumentParser
 from pathlib import Path
+import os
 
+import numpy as np
+
+
+ROUND_SIZE = len(b'A X')
+WHITESPACE = b' \t\n\r\x0b\x0c'
+BLOCK_RECORDS = 1 << 20
 
 SHAPE_SCORES = {
     'Rock': 1,
@@ -8,6 +15,16 @@ SHAPE_SCORES = {
     'Scissors': 3,
 }
 
+OPPONENT_CODES = {'A': 'Rock', 'B': 'Paper', 'C': 'Scissors'}
+RESPONSE_CODES = {'X': 'Rock', 'Y': 'Paper', 'Z': 'Scissors'}
+
+MOVES_AND_BEATING_MOVES = [
+    ('Rock', 'Paper'),
+    ('Paper', 'Scissors'),
+    ('Scissors', 'Rock')
+]
+MOVE_TO_WIN = dict(MOVES_AND_BEATING_MOVES)
+
 
 def build_parser():
     parser = ArgumentParser()
@@ -16,14 +33,120 @@ def build_parser():
         required=True
     )
 
-    return parser
+    parser.add_argument(
+        '--engine', choices=['table', 'mmap', 'replace'], default='table',
+        help=(
+            'mmap expects one \'A X\' record per line, with all LF or all '
+            'CRLF endings and blank lines only at the end'
+        )
+    )
 
+    return parser
 
-def main():
-    args = build_parser().parse_args()
-    with open(args.input_filename) as fd:
-        data = fd.read().rstrip()
 
+def outcome_score(opponent_move, my_move):
+    if my_move == MOVE_TO_WIN[opponent_move]:
+        return 6
+    elif my_move == opponent_move:
+        return 3
+    return 0
+
+
+def choose_move(opponent_move, response_code):
+    return RESPONSE_CODES[response_code]
+
+
+def build_score_table(response_to_move):
+    # Maps each (opponent code, response code) pair to the score for a round
+    return {
+        (opponent_code, response_code): (
+            SHAPE_SCORES[my_move] + outcome_score(opponent_move, my_move)
+        )
+        for opponent_code, opponent_move in OPPONENT_CODES.items()
+        for response_code in RESPONSE_CODES
+        for my_move in [response_to_move(opponent_move, response_code)]
+    }
+
+
+def count_pairs(data):
+    # Every round is a fixed 'A X' shaped record, so a bytes.count per pair
+    #  tallies the whole guide without splitting it into lines. Anything
+    #  else would go uncounted, so every byte that isn't whitespace must
+    #  be a code in one of the counted pairs.
+    counts = {
+        (opponent_code, response_code): data.count(
+            f'{opponent_code} {response_code}'.encode()
+        )
+        for opponent_code in OPPONENT_CODES
+        for response_code in RESPONSE_CODES
+    }
+    n_codes = len(data) - sum(
+        data.count(bytes([whitespace])) for whitespace in WHITESPACE
+    )
+    if n_codes != 2 * sum(counts.values()):
+        raise ValueError('Expected one \'A X\' record per line')
+
+    return counts
+
+
+def count_records(buffer):
+    # Views the buffer as fixed size 'A X\n' (or 'A X\r\n') records and
+    #  bincounts each block of them, so no per line Python objects are made.
+    end = buffer.size
+    while end and int(buffer[end - 1]) in WHITESPACE:
+        end -= 1
+    if not end:
+        return count_pairs(b'')
+
+    line_ending = b'\n'
+    if end > ROUND_SIZE and buffer[ROUND_SIZE] == ord('\r'):
+        line_ending = b'\r\n'
+    record_size = ROUND_SIZE + len(line_ending)
+    # The last round has no line ending once trailing whitespace is gone
+    n_records, misaligned = divmod(end + len(line_ending), record_size)
+    if misaligned:
+        raise ValueError('Expected one \'A X\' record per line')
+    records = buffer[:(n_records - 1) * record_size].reshape(-1, record_size)
+
+    pair_counts = np.zeros(len(OPPONENT_CODES) * len(RESPONSE_CODES), int)
+    for start in range(0, n_records - 1, BLOCK_RECORDS):
+        block = records[start:start + BLOCK_RECORDS]
+        # Signed, so codes below 'A' or 'X' go negative rather than wrap
+        codes = block[:, [0, 2]].astype(np.intp)
+        codes -= [ord('A'), ord('X')]
+        malformed = (
+            (codes < 0).any(axis=1) |
+            (codes[:, 0] >= len(OPPONENT_CODES)) |
+            (codes[:, 1] >= len(RESPONSE_CODES)) |
+            (block[:, 1] != ord(' '))
+        )
+        for column, byte in enumerate(line_ending, ROUND_SIZE):
+            malformed |= block[:, column] != byte
+        if malformed.any():
+            raise ValueError('Expected one \'A X\' record per line')
+        pair_indices = codes[:, 0] * len(RESPONSE_CODES) + codes[:, 1]
+        pair_counts += np.bincount(pair_indices, minlength=pair_counts.size)
+
+    counts = count_pairs(bytes(buffer[end - ROUND_SIZE:end]))
+    for index, pair in enumerate(counts):
+        counts[pair] += int(pair_counts[index])
+
+    return counts
+
+
+def mmap_count_pairs(fd):
+    # np.memmap can't map an empty file
+    if not os.fstat(fd.fileno()).st_size:
+        return count_pairs(b'')
+
+    return count_records(np.memmap(fd, dtype=np.uint8, mode='r'))
+
+
+def table_score(counts, score_table):
+    return sum(count * score_table[pair] for pair, count in counts.items())
+
+
+def replace_engine(data):
     data = data.replace('X', 'A')
     data = data.replace('Y', 'B')
     data = data.replace('Z', 'C')
@@ -53,6 +176,20 @@ def main():
     win_score = 6 * n_wins
     total_score = my_total_shape_score + win_score + draw_score
 
+    return total_score
+
+
+def main():
+    args = build_parser().parse_args()
+    score_table = build_score_table(choose_move)
+    with open(args.input_filename, 'rb') as fd:
+        if args.engine == 'mmap':
+            total_score = table_score(mmap_count_pairs(fd), score_table)
+        elif args.engine == 'table':
+            total_score = table_score(count_pairs(fd.read()), score_table)
+        else:
+            total_score = replace_engine(fd.read().decode().rstrip())
+
     print(total_score)
 
 
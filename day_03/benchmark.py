@@ -0,0 +1,119 @@
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import random
+
+import part1
+import part2
+
+
+def build_parser():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '--n-groups', type=int, default=300000
+    )
+    parser.add_argument(
+        '--seed', type=int, default=2022
+    )
+
+    return parser
+
+
+def make_rucksack(rng, badge):
+    others = [item for item in part1.ITEM_TYPES if item != badge]
+    rng.shuffle(others)
+    common, first_items, second_items = others[0], others[1:26], others[26:]
+    half_size = rng.randint(6, 16)
+    first_half = rng.choices(first_items, k=half_size - 2) + [common, badge]
+    second_half = rng.choices(second_items, k=half_size - 1) + [common]
+    rng.shuffle(first_half)
+    rng.shuffle(second_half)
+
+    return ''.join(first_half + second_half)
+
+
+def write_manifest(filename, n_groups, seed):
+    # Only groups with a single badge are kept, so every engine is
+    #  answering the same well-defined question.
+    rng = random.Random(seed)
+    with open(filename, 'w') as fd:
+        n_written = 0
+        while n_written < n_groups:
+            badge = rng.choice(part1.ITEM_TYPES)
+            group = [make_rucksack(rng, badge) for _ in range(3)]
+            if len(set.intersection(*map(set, group))) == 1:
+                fd.write('\n'.join(group) + '\n')
+                n_written += 1
+
+
+def set_part1(lines):
+    return sum(part1.priority(part1.common_item(line)) for line in lines)
+
+
+def mask_part1(lines):
+    return sum(part1.common_item_priority(line) for line in lines)
+
+
+def set_part2(lines):
+    triplets = part2.chunked_iterable(map(set, lines), 3)
+
+    return sum(
+        part2.priority(set.intersection(*triplet).pop())
+        for triplet in triplets
+    )
+
+
+def mask_part2(lines):
+    groups = part2.chunked_iterable(lines, 3)
+
+    return sum(part2.badge_priority(group) for group in groups)
+
+
+def timed(function, *args):
+    start = perf_counter()
+    result = function(*args)
+
+    return perf_counter() - start, int(result)
+
+
+def main():
+    args = build_parser().parse_args()
+
+    with TemporaryDirectory() as directory:
+        filename = Path(directory) / 'rucksacks.txt'
+        write_manifest(filename, args.n_groups, args.seed)
+        with open(filename) as fd:
+            lines = fd.read().splitlines()
+        print(f'{len(lines)} rucksacks')
+
+        engines = {
+            'part1': [
+                ('set', set_part1, lines),
+                ('mask', mask_part1, lines),
+                ('numpy', lambda: part1.batch_common_item_priorities(
+                    *part1.load_lines(filename)
+                ).sum()),
+            ],
+            'part2': [
+                ('set', set_part2, lines),
+                ('mask', mask_part2, lines),
+                ('numpy', lambda: part2.batch_badge_priorities(
+                    *part2.load_lines(filename)
+                ).sum()),
+            ],
+        }
+        for part, runs in engines.items():
+            baseline, expected = None, None
+            for name, function, *function_args in runs:
+                elapsed, result = timed(function, *function_args)
+                assert expected is None or result == expected
+                baseline, expected = baseline or elapsed, result
+                print(
+                    f'{part} {name}: {elapsed:.3f}s, '
+                    f'speedup {baseline / elapsed:.2f}x'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,24 @@
 from argparse import ArgumentParser
+from functools import reduce
+from operator import or_
 from pathlib import Path
+from string import ascii_lowercase, ascii_uppercase
+
+import numpy as np
+
+
+NEWLINE = ord('\n')
+
+# Ordered by priority, so an item's bit index is its priority minus one
+ITEM_TYPES = ascii_lowercase + ascii_uppercase
+ITEM_BITS = {
+    character: 1 << index
+    for index, character in enumerate(ITEM_TYPES)
+}
+
+BYTE_TO_ITEM_BIT = np.zeros(256, dtype=np.uint64)
+for character, bit in ITEM_BITS.items():
+    BYTE_TO_ITEM_BIT[ord(character)] = bit
 
 
 def build_parser():
@@ -9,6 +28,10 @@ def build_parser():
         required=True
     )
 
+    parser.add_argument(
+        '--engine', choices=['set', 'mask', 'numpy'], default='numpy'
+    )
+
     return parser
 
 
@@ -26,13 +49,63 @@ def common_item(string):
     return intersection.pop()
 
 
+def item_mask(string):
+    return reduce(or_, map(ITEM_BITS.__getitem__, string), 0)
+
+
+def common_item_priority(string):
+    midpoint = len(string) // 2
+    common = item_mask(string[:midpoint]) & item_mask(string[midpoint:])
+
+    return common.bit_length()
+
+
+def load_lines(filename):
+    buffer = np.fromfile(filename, dtype=np.uint8)
+    if not buffer.size or buffer[-1] != NEWLINE:
+        buffer = np.append(buffer, np.uint8(NEWLINE))
+
+    line_ends = np.flatnonzero(buffer == NEWLINE)
+    line_starts = np.concatenate([[0], line_ends[:-1] + 1])
+    nonblank = line_ends > line_starts
+
+    return buffer, line_starts[nonblank], line_ends[nonblank]
+
+
+def mask_priorities(masks):
+    # Masks only have bits below 2 ** 52, so the exponent from frexp is
+    #  exactly bit_length.
+    return np.frexp(masks.astype(np.float64))[1]
+
+
+def batch_common_item_priorities(buffer, line_starts, line_ends):
+    # Each rucksack half is OR-reduced into a mask in one reduceat call.
+    #  The newline ending the second half maps to no bit, so it's harmless.
+    item_bits = BYTE_TO_ITEM_BIT[buffer]
+    midpoints = (line_starts + line_ends) // 2
+    halves = np.bitwise_or.reduceat(
+        item_bits, np.column_stack([line_starts, midpoints]).ravel()
+    )
+
+    return mask_priorities(halves[0::2] & halves[1::2])
+
+
 def main():
     args = build_parser().parse_args()
 
-    with open(args.input_filename) as fd:
-        lines = fd.read().splitlines()
+    if args.engine == 'numpy':
+        priorities = batch_common_item_priorities(
+            *load_lines(args.input_filename)
+        )
+        print(int(priorities.sum()))
+    else:
+        with open(args.input_filename) as fd:
+            lines = fd.read().splitlines()
 
-    print(sum(priority(common_item(line)) for line in lines))
+        if args.engine == 'mask':
+            print(sum(common_item_priority(line) for line in lines))
+        else:
+            print(sum(priority(common_item(line)) for line in lines))
 
 
 if __name__ == '__main__':
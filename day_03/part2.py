@@ -1,7 +1,29 @@
 from argparse import ArgumentParser
+from functools import reduce
+from operator import and_, or_
 from pathlib import Path
+from string import ascii_lowercase, ascii_uppercase
 import itertools
 
+import numpy as np
+
+
+GROUP_SIZE = 3
+NEWLINE = ord('\n')
+
+# Ordered by priority, so an item's bit index is its priority minus one
+ITEM_TYPES = ascii_lowercase + ascii_uppercase
+ITEM_BITS = {
+    character: 1 << index
+    for index, character in enumerate(ITEM_TYPES)
+}
+
+ALL_ITEMS = (1 << len(ITEM_TYPES)) - 1
+
+BYTE_TO_ITEM_BIT = np.zeros(256, dtype=np.uint64)
+for character, bit in ITEM_BITS.items():
+    BYTE_TO_ITEM_BIT[ord(character)] = bit
+
 
 # The classic missing iterator
 # https://alexwlchan.net/2018/12/iterating-in-fixed-size-chunks/
@@ -21,6 +43,14 @@ def build_parser():
         required=True
     )
 
+    parser.add_argument(
+        '--engine', choices=['set', 'mask', 'numpy', 'stream'],
+        default='numpy'
+    )
+    parser.add_argument(
+        '--group-size', type=int, default=GROUP_SIZE
+    )
+
     return parser
 
 
@@ -38,21 +68,93 @@ def common_item(string):
     return intersection.pop()
 
 
+def item_mask(string):
+    return reduce(or_, map(ITEM_BITS.__getitem__, string), 0)
+
+
+def load_lines(filename):
+    buffer = np.fromfile(filename, dtype=np.uint8)
+    if not buffer.size or buffer[-1] != NEWLINE:
+        buffer = np.append(buffer, np.uint8(NEWLINE))
+
+    line_ends = np.flatnonzero(buffer == NEWLINE)
+    line_starts = np.concatenate([[0], line_ends[:-1] + 1])
+    nonblank = line_ends > line_starts
+
+    return buffer, line_starts[nonblank], line_ends[nonblank]
+
+
+def mask_priorities(masks):
+    # Masks only have bits below 2 ** 52, so the exponent from frexp is
+    #  exactly bit_length.
+    return np.frexp(masks.astype(np.float64))[1]
+
+
+def badge_priority(group):
+    return reduce(and_, map(item_mask, group)).bit_length()
+
+
+def stream_badge_priorities(lines, group_size=GROUP_SIZE):
+    # Only one group is held at a time. Each group has exactly one badge,
+    #  so once a single candidate is left the rest needn't be masked.
+    for group in chunked_iterable(lines, group_size):
+        candidates = ALL_ITEMS
+        for rucksack in group:
+            candidates &= item_mask(rucksack.rstrip('\n'))
+            if not candidates & (candidates - 1):
+                break
+        yield candidates.bit_length()
+
+
+def batch_badge_priorities(buffer, line_starts, line_ends,
+                           group_size=GROUP_SIZE):
+    # Each segment runs to the next line start, so it picks up a newline,
+    #  which maps to no bit.
+    rucksack_masks = np.bitwise_or.reduceat(
+        BYTE_TO_ITEM_BIT[buffer], line_starts
+    )
+    n_full = len(rucksack_masks) - len(rucksack_masks) % group_size
+    badges = np.bitwise_and.reduce(
+        rucksack_masks[:n_full].reshape(-1, group_size), axis=1
+    )
+    if n_full < len(rucksack_masks):
+        badges = np.append(
+            badges, np.bitwise_and.reduce(rucksack_masks[n_full:])
+        )
+
+    return mask_priorities(badges)
+
+
 def main():
     args = build_parser().parse_args()
 
-    with open(args.input_filename) as fd:
-        lines = fd.read().splitlines()
+    if args.engine == 'numpy':
+        priorities = batch_badge_priorities(
+            *load_lines(args.input_filename), args.group_size
+        )
+        print(int(priorities.sum()))
+    elif args.engine == 'stream':
+        with open(args.input_filename) as fd:
+            print(sum(stream_badge_priorities(fd, args.group_size)))
+    else:
+        with open(args.input_filename) as fd:
+            lines = fd.read().splitlines()
 
-    sets = map(set, lines)
+        if args.engine == 'mask':
+            groups = chunked_iterable(lines, args.group_size)
+            print(sum(badge_priority(group) for group in groups))
+        else:
+            sets = map(set, lines)
 
-    triplets = chunked_iterable(iter(sets), 3)
+            triplets = chunked_iterable(iter(sets), args.group_size)
 
-    badges = [set.intersection(*triplet).pop() for triplet in triplets]
+            badges = [
+                set.intersection(*triplet).pop() for triplet in triplets
+            ]
 
-    print(
-        sum(priority(badge) for badge in badges)
-    )
+            print(
+                sum(priority(badge) for badge in badges)
+            )
 
 
 if __name__ == '__main__':
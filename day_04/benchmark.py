@@ -0,0 +1,83 @@
+from argparse import ArgumentParser
+from time import perf_counter
+import random
+
+import part1
+import part2
+
+
+def build_parser():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '--n-lines', type=int, default=1000000
+    )
+    parser.add_argument(
+        '--max-section', type=int, default=99
+    )
+    parser.add_argument(
+        '--seed', type=int, default=2022
+    )
+
+    return parser
+
+
+def make_assignments(n_lines, max_section, seed):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n_lines):
+        first = sorted(rng.randint(1, max_section) for _ in range(2))
+        second = sorted(rng.randint(1, max_section) for _ in range(2))
+        lines.append(f'{first[0]}-{first[1]},{second[0]}-{second[1]}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def timed(function, *args):
+    start = perf_counter()
+    result = function(*args)
+
+    return perf_counter() - start, result
+
+
+def regex_part1(data):
+    return sum(
+        part1.one_contains_other(*part1.line_to_interval_pair(line))
+        for line in data.splitlines()
+    )
+
+
+def numpy_part1(data):
+    return part1.count_one_contains_other(part1.load_assignments(data))
+
+
+def regex_part2(data):
+    return sum(
+        part2.overlap(*part2.line_to_interval_pair(line))
+        for line in data.splitlines()
+    )
+
+
+def numpy_part2(data):
+    return part2.count_overlaps(part2.load_assignments(data))
+
+
+def main():
+    args = build_parser().parse_args()
+    data = make_assignments(args.n_lines, args.max_section, args.seed)
+
+    for part, engines in [
+        ('part1', [('regex', regex_part1), ('numpy', numpy_part1)]),
+        ('part2', [('regex', regex_part2), ('numpy', numpy_part2)]),
+    ]:
+        results = set()
+        for name, function in engines:
+            elapsed, result = timed(function, data)
+            results.add(result)
+            print(
+                f'{part} {name}: {args.n_lines / elapsed:,.0f} lines/s'
+            )
+        assert len(results) == 1, results
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,11 @@ from argparse import ArgumentParser
 from pathlib import Path
 import re
 
+import numpy as np
+
+
+SEPARATORS_TO_SPACES = str.maketrans('-,', '  ')
+
 
 def build_parser():
     parser = ArgumentParser()
@@ -10,35 +15,94 @@ def build_parser():
         required=True
     )
 
+    parser.add_argument(
+        '--engine', choices=['interval', 'numpy'], default='interval'
+    )
+
     return parser
 
 
-def set_from_exclusive_endpoints(start, end):
-    return set(range(start, end + 1))
+class Interval:
+    # Inclusive at both ends, as section assignments are
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+    @property
+    def empty(self):
+        return self.start > self.end
 
+    def overlaps(self, other):
+        if self.empty or other.empty:
+            return False
 
-def line_to_set_pair(line):
+        return self.start <= other.end and other.start <= self.end
+
+
+def parse_line(line):
     match_object = re.match(r'(\d+)-(\d+),(\d+)-(\d+)', line)
-    match_ints = map(int, match_object.groups())
-    first_start, first_end, second_start, second_end = match_ints
+
+    return tuple(map(int, match_object.groups()))
+
+
+def line_to_interval_pair(line):
+    first_start, first_end, second_start, second_end = parse_line(line)
 
     return (
-        set_from_exclusive_endpoints(first_start, first_end),
-        set_from_exclusive_endpoints(second_start, second_end)
+        Interval(first_start, first_end),
+        Interval(second_start, second_end)
     )
 
 
 def overlap(first, second):
-    return len(first.intersection(second)) > 0
+    return first.overlaps(second)
+
+
+def load_assignments(data):
+    # One (first_start, first_end, second_start, second_end) row per line
+    values = np.fromstring(
+        data.translate(SEPARATORS_TO_SPACES), dtype=np.int64, sep=' '
+    )
+
+    return values.reshape(-1, 4)
+
+
+def unpack_columns(assignments):
+    first_start, first_end, second_start, second_end = assignments.T
+    first_empty = first_start > first_end
+    second_empty = second_start > second_end
+
+    return (
+        first_start, first_end, first_empty,
+        second_start, second_end, second_empty
+    )
+
+
+def count_overlaps(assignments):
+    (
+        first_start, first_end, first_empty,
+        second_start, second_end, second_empty
+    ) = unpack_columns(assignments)
+
+    return int(np.count_nonzero(
+        (first_start <= second_end) & (second_start <= first_end) &
+        ~first_empty & ~second_empty
+    ))
 
 
 def main():
     args = build_parser().parse_args()
 
     with open(args.input_filename) as fd:
-        lines = fd.read().splitlines()
-
-    print(sum(overlap(*line_to_set_pair(line)) for line in lines))
+        data = fd.read()
+
+    if args.engine == 'numpy':
+        print(count_overlaps(load_assignments(data)))
+    else:
+        print(sum(
+            overlap(*line_to_interval_pair(line))
+            for line in data.splitlines()
+        ))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,208 @@
+from argparse import ArgumentParser
+from pathlib import Path
+import sys
+
+import numpy as np
+
+from part2 import parse_line
+
+
+def build_parser():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '-i', '--input-filename', type=Path,
+        help='Assignments to index, otherwise --index-filename is loaded'
+    )
+    parser.add_argument(
+        '--index-filename', type=Path,
+        help='Where to save a built index, or load one from'
+    )
+    parser.add_argument(
+        '-q', '--queries-filename', type=Path,
+        help=(
+            'One query per line, a section S or a range A-B. '
+            'Reads stdin if not given'
+        )
+    )
+
+    return parser
+
+
+class IntervalIndex:
+    # A centred interval tree, flattened into arrays so it can be written
+    #  with np.savez. Each node holds the intervals containing its centre,
+    #  sorted once by start and once by descending end.
+    ARRAY_NAMES = [
+        'starts', 'ends', 'centres', 'lefts', 'rights', 'offsets', 'counts',
+        'by_start', 'by_end', 'order'
+    ]
+
+    def __init__(
+            self, starts, ends,
+            centres, lefts, rights, offsets, counts,
+            by_start, by_end, order):
+
+        self.starts = starts
+        self.ends = ends
+
+        self.centres = centres
+        self.lefts = lefts
+        self.rights = rights
+        self.offsets = offsets
+        self.counts = counts
+
+        self.by_start = by_start
+        self.by_end = by_end
+        self.order = order
+
+        # Endpoints laid out alongside by_start, by_end and order, so that
+        #  each search is a searchsorted over a contiguous slice.
+        self.node_starts = starts[by_start]
+        self.negated_node_ends = -ends[by_end]
+        self.sorted_starts = starts[order]
+
+    @classmethod
+    def from_intervals(cls, starts, ends):
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+
+        centres, lefts, rights, offsets, counts = [], [], [], [], []
+        by_start, by_end = [], []
+        n_placed = 0
+
+        non_empty = np.flatnonzero(starts <= ends)
+        pending = [(non_empty, None, None)] if non_empty.size else []
+        while pending:
+            ids, parent, children = pending.pop()
+            node = len(centres)
+            if parent is not None:
+                children[parent] = node
+
+            # The median endpoint always splits the intervals, so each
+            #  subtree is strictly smaller than its parent.
+            centre = int(np.median(np.concatenate([starts[ids], ends[ids]])))
+            contains_centre = (starts[ids] <= centre) & (ends[ids] >= centre)
+            here = ids[contains_centre]
+
+            centres.append(centre)
+            lefts.append(-1)
+            rights.append(-1)
+            offsets.append(n_placed)
+            counts.append(here.size)
+            by_start.append(here[np.argsort(starts[here], kind='stable')])
+            by_end.append(here[np.argsort(-ends[here], kind='stable')])
+            n_placed += here.size
+
+            left_ids = ids[~contains_centre & (ends[ids] < centre)]
+            right_ids = ids[~contains_centre & (starts[ids] > centre)]
+            if left_ids.size:
+                pending.append((left_ids, node, lefts))
+            if right_ids.size:
+                pending.append((right_ids, node, rights))
+
+        return cls(
+            starts, ends,
+            *[
+                np.array(values, dtype=np.int64)
+                for values in [centres, lefts, rights, offsets, counts]
+            ],
+            *[
+                np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+                for ids in [by_start, by_end]
+            ],
+            non_empty[np.argsort(starts[non_empty], kind='stable')]
+        )
+
+    @classmethod
+    def from_lines(cls, lines):
+        # Elves are numbered in input order, two to a line
+        endpoints = np.array(
+            [parse_line(line) for line in lines], dtype=np.int64
+        ).reshape(-1, 2)
+
+        return cls.from_intervals(endpoints[:, 0], endpoints[:, 1])
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename) as arrays:
+            return cls(**{name: arrays[name] for name in cls.ARRAY_NAMES})
+
+    def save(self, filename):
+        with open(filename, 'wb') as fd:
+            np.savez(fd, **{
+                name: getattr(self, name) for name in self.ARRAY_NAMES
+            })
+
+    def stab(self, section):
+        # Walks one root to leaf path. Each node contributes a prefix of
+        #  one of its sorted lists, so this is O(log n + k).
+        found = []
+        node = 0 if self.centres.size else -1
+        while node != -1:
+            centre = self.centres[node]
+            start = self.offsets[node]
+            stop = start + self.counts[node]
+            if section < centre:
+                n_found = np.searchsorted(
+                    self.node_starts[start:stop], section, side='right'
+                )
+                found.append(self.by_start[start:start + n_found])
+                node = self.lefts[node]
+            elif section > centre:
+                n_found = np.searchsorted(
+                    self.negated_node_ends[start:stop], -section,
+                    side='right'
+                )
+                found.append(self.by_end[start:start + n_found])
+                node = self.rights[node]
+            else:
+                found.append(self.by_start[start:stop])
+                break
+
+        return np.concatenate(found) if found else np.zeros(0, np.int64)
+
+    def overlapping(self, first, last):
+        # Intervals overlapping [first, last] either contain first, or
+        #  start somewhere after it but no later than last.
+        start = np.searchsorted(self.sorted_starts, first, side='right')
+        stop = np.searchsorted(self.sorted_starts, last, side='right')
+
+        return np.concatenate([self.stab(first), self.order[start:stop]])
+
+
+def answer(index, query):
+    first, _, last = query.partition('-')
+    if last:
+        return index.overlapping(int(first), int(last))
+
+    return index.stab(int(first))
+
+
+def main():
+    args = build_parser().parse_args()
+
+    if args.input_filename:
+        with open(args.input_filename) as fd:
+            index = IntervalIndex.from_lines(fd.read().splitlines())
+        if args.index_filename:
+            index.save(args.index_filename)
+    elif args.index_filename:
+        index = IntervalIndex.load(args.index_filename)
+    else:
+        build_parser().error('one of -i or --index-filename is required')
+
+    if args.queries_filename:
+        fd = open(args.queries_filename)
+    else:
+        fd = sys.stdin
+
+    with fd:
+        for line in fd:
+            query = line.strip()
+            if query:
+                elves = np.sort(answer(index, query))
+                print(f'{query}: {" ".join(map(str, elves))}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+from argparse import ArgumentParser
+from array import array
+from copy import deepcopy
+from itertools import chain
+from pathlib import Path
+from string import ascii_uppercase
+from time import perf_counter
+import random
+
+import part1
+import part2
+
+
+def build_parser():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '--n-stacks', type=int, default=9
+    )
+    parser.add_argument(
+        '--stack-height', type=int, default=10000
+    )
+    parser.add_argument(
+        '--n-moves', type=int, default=100000
+    )
+    parser.add_argument(
+        '--max-count', type=int, default=2000
+    )
+    parser.add_argument(
+        '--backends', nargs='+', default=['pop', 'list', 'rope']
+    )
+    parser.add_argument(
+        '--seed', type=int, default=2022
+    )
+    parser.add_argument(
+        '-o', '--output-filename', type=Path,
+        help='Also write the generated puzzle input here'
+    )
+
+    return parser
+
+
+def make_procedure(n_stacks, stack_height, n_moves, max_count, seed):
+    # Moves never empty a stack, so every stack has a top at the end
+    rng = random.Random(seed)
+    crates = {
+        key: rng.choices(ascii_uppercase, k=stack_height)
+        for key in range(1, n_stacks + 1)
+    }
+    heights = {key: len(stack) for key, stack in crates.items()}
+
+    moves = []
+    for _ in range(n_moves):
+        source = rng.choice([key for key in heights if heights[key] > 1])
+        dest = rng.choice([key for key in heights if key != source])
+        count = rng.randint(1, min(max_count, heights[source] - 1))
+        heights[source] -= count
+        heights[dest] += count
+        moves.append((count, source, dest))
+
+    return crates, moves
+
+
+def write_puzzle_input(filename, crates, moves):
+    keys = sorted(crates)
+    tallest = max(len(crates[key]) for key in keys)
+    with open(filename, 'w') as fd:
+        for level in reversed(range(tallest)):
+            fd.write(' '.join(
+                f'[{crates[key][level]}]'
+                if level < len(crates[key]) else '   '
+                for key in keys
+            ) + '\n')
+        fd.write(' '.join(f' {key} ' for key in keys) + '\n\n')
+        for count, source, dest in moves:
+            fd.write(f'move {count} from {source} to {dest}\n')
+
+
+def run(move, crates, moves):
+    for count, source, dest in moves:
+        move(crates, count, source, dest)
+
+    return ''.join(crates[key].pop() for key in sorted(crates))
+
+
+def main():
+    args = build_parser().parse_args()
+    crates, moves = make_procedure(
+        args.n_stacks, args.stack_height, args.n_moves, args.max_count,
+        args.seed
+    )
+    if args.output_filename:
+        write_puzzle_input(args.output_filename, crates, moves)
+
+    n_crates_moved = sum(count for count, _, _ in moves)
+    print(f'{len(moves)} moves, {n_crates_moved} crates moved')
+
+    for part in [part1, part2]:
+        answers = set()
+        for backend in args.backends:
+            stacks = deepcopy(crates)
+            if backend == 'rope':
+                stacks = {
+                    key: part.RopeStack.from_list(stack)
+                    for key, stack in stacks.items()
+                }
+            start = perf_counter()
+            answers.add(run(part.MOVERS[backend], stacks, moves))
+            elapsed = perf_counter() - start
+            print(f'{part.__name__} {backend}: {elapsed:.2f}s')
+
+        start = perf_counter()
+        program = array('q', chain.from_iterable(moves))
+        tops = part.trace_tops(crates, program)
+        answers.add(''.join(tops[key] for key in sorted(tops)))
+        elapsed = perf_counter() - start
+        print(f'{part.__name__} compile: {elapsed:.2f}s')
+        assert len(answers) == 1, answers
+
+
+if __name__ == '__main__':
+    main()
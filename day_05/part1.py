@@ -1,6 +1,6 @@
 from argparse import ArgumentParser
+from array import array
 from pathlib import Path
-import re
 
 
 def build_parser():
@@ -10,6 +10,15 @@ def build_parser():
         required=True
     )
 
+    parser.add_argument(
+        '--backend', choices=['list', 'rope', 'pop'], default='list',
+        help='Move crates with slices, block views, or one at a time'
+    )
+    parser.add_argument(
+        '--solver', choices=['simulate', 'compile'], default='simulate',
+        help='Move every crate, or trace only the final tops back'
+    )
+
     return parser
 
 
@@ -21,6 +30,26 @@ def stackify(character_collection):
     return list(''.join(character_collection).replace(' ', ''))
 
 
+def read_drawing(fd):
+    # Only strip newlines, as it's important that the crates string is
+    #  square.
+    starting_crates_lines = []
+    for line in fd:
+        line = line.rstrip('\n')
+        if not line:
+            break
+        starting_crates_lines.append(line)
+
+    return starting_crates_lines
+
+
+def parse_move(line):
+    # Every instruction is 'move N from A to B'
+    _, count, _, source, _, dest = line.split()
+
+    return int(count), int(source), int(dest)
+
+
 def make_crates(starting_crates_lines):
     character_lists = [
         line[::-1]
@@ -34,32 +63,180 @@ def make_crates(starting_crates_lines):
     }
 
 
+class RopeStack:
+    # A stack held as a list of (crates, start, stop, flipped) views onto
+    #  shared lists, bottom block first. Moves split and concatenate views
+    #  and reversal only flips flags, so crates themselves aren't copied.
+    MAX_BLOCKS = 1024
+
+    def __init__(self, blocks=None):
+        self.blocks = blocks if blocks is not None else []
+
+    @classmethod
+    def from_list(cls, crates):
+        return cls([(crates, 0, len(crates), False)] if crates else [])
+
+    def __len__(self):
+        return sum(stop - start for _, start, stop, _ in self.blocks)
+
+    def __iter__(self):
+        for crates, start, stop, flipped in self.blocks:
+            if flipped:
+                yield from reversed(crates[start:stop])
+            else:
+                yield from crates[start:stop]
+
+    def take(self, count):
+        taken = []
+        while count:
+            crates, start, stop, flipped = self.blocks.pop()
+            if stop - start > count:
+                # A flipped view has its top at the start of its slice
+                if flipped:
+                    self.blocks.append((crates, start + count, stop, True))
+                    taken.append((crates, start, start + count, True))
+                else:
+                    self.blocks.append((crates, start, stop - count, False))
+                    taken.append((crates, stop - count, stop, False))
+                break
+
+            taken.append((crates, start, stop, flipped))
+            count -= stop - start
+
+        return RopeStack(taken[::-1])
+
+    def reversed(self):
+        return RopeStack([
+            (crates, start, stop, not flipped)
+            for crates, start, stop, flipped in reversed(self.blocks)
+        ])
+
+    def put(self, other):
+        for block in other.blocks:
+            self.append_block(block)
+
+        # Compact heavily fragmented stacks, so that a move costs at most
+        #  MAX_BLOCKS view operations.
+        if len(self.blocks) > self.MAX_BLOCKS:
+            self.blocks = RopeStack.from_list(list(self)).blocks
+
+    def append_block(self, block):
+        # Re-join views that were split from the same run of crates
+        if self.blocks:
+            crates, start, stop, flipped = self.blocks[-1]
+            other_crates, other_start, other_stop, other_flipped = block
+            if crates is other_crates and flipped == other_flipped:
+                if not flipped and stop == other_start:
+                    self.blocks[-1] = (crates, start, other_stop, False)
+                    return
+                if flipped and start == other_stop:
+                    self.blocks[-1] = (crates, other_start, stop, True)
+                    return
+        self.blocks.append(block)
+
+    def pop(self):
+        crate, = self.take(1)
+
+        return crate
+
+
+def move_crates(crates, count, source, dest):
+    # The crane lifts one crate at a time, so the moved run lands reversed
+    if not count or source == dest:
+        return
+    moving = crates[source][-count:]
+    del crates[source][-count:]
+    crates[dest].extend(reversed(moving))
+
+
+def move_rope_crates(crates, count, source, dest):
+    if not count or source == dest:
+        return
+    crates[dest].put(crates[source].take(count).reversed())
+
+
+def move_crates_one_at_a_time(crates, count, source, dest):
+    for _ in range(count):
+        crates[dest].append(crates[source].pop())
+
+
+def compile_procedure(lines):
+    # Moves packed as flat (count, source, dest) machine integers
+    program = array('q')
+    for line in lines:
+        if line.strip():
+            program.extend(parse_move(line))
+
+    return program
+
+
+def trace_tops(crates, program):
+    # Rather than moving crates, follow each final top back through the
+    #  program as a (stack, depth from top) position until it names a
+    #  crate in the starting drawing. This is O(moves * stacks) however
+    #  many crates the moves carry.
+    heights = {key: len(stack) for key, stack in crates.items()}
+    for index in range(0, len(program), 3):
+        count, source, dest = program[index:index + 3]
+        heights[source] -= count
+        heights[dest] += count
+
+    keys = sorted(key for key, height in heights.items() if height)
+    positions = [(key, 0) for key in keys]
+    for index in range(len(program) - 3, -1, -3):
+        count, source, dest = program[index:index + 3]
+        if not count or source == dest:
+            continue
+
+        for position_index, (stack, depth) in enumerate(positions):
+            if stack == dest and depth < count:
+                # The crane reverses the run it moves
+                positions[position_index] = (source, count - 1 - depth)
+            elif stack == dest:
+                positions[position_index] = (dest, depth - count)
+            elif stack == source:
+                positions[position_index] = (source, depth + count)
+
+    return {
+        key: crates[stack][-1 - depth]
+        for key, (stack, depth) in zip(keys, positions)
+    }
+
+
+MOVERS = {
+    'list': move_crates,
+    'rope': move_rope_crates,
+    'pop': move_crates_one_at_a_time,
+}
+
+
 def main():
     args = build_parser().parse_args()
 
     with open(args.input_filename) as fd:
-        data = fd.read()
+        crates = make_crates(read_drawing(fd))
+        if args.solver == 'compile':
+            tops = trace_tops(crates, compile_procedure(fd))
+            answer = ''.join(tops[key] for key in sorted(tops))
+        else:
+            if args.backend == 'rope':
+                crates = {
+                    key: RopeStack.from_list(stack)
+                    for key, stack in crates.items()
+                }
+            move = MOVERS[args.backend]
+
+            # Moves are applied as they're read, so the procedure is never
+            #  held in memory.
+            for line in fd:
+                if line.strip():
+                    move(crates, *parse_move(line))
+
+            answer = ''.join([
+                crates[key].pop()
+                for key in sorted(crates.keys())
+            ])
 
-    starting_crates_lines, procedure_lines = [
-        string.split('\n')
-        for string in data.split('\n\n')
-    ]
-    # Remove the last one to prevent a blank instruction.
-    #  Don't do via stripping input data as it's important
-    #  that the crates string is square.
-    procedure_lines = procedure_lines[:-1]
-    crates = make_crates(starting_crates_lines)
-
-    for line in procedure_lines:
-        count, source, dest = map(int, re.findall(r'\d+', line))
-
-        for _ in range(count):
-            crates[dest].append(crates[source].pop())
-
-    answer = ''.join([
-        crates[key].pop()
-        for key in sorted(crates.keys())
-    ])
     print(answer)
 
 
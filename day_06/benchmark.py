@@ -0,0 +1,79 @@
+from argparse import ArgumentParser
+from itertools import islice
+from time import perf_counter
+
+import numpy as np
+
+from part1 import first_markers, numpy_scan_runs, scan_runs, window_markers
+
+
+ENGINES = {
+    'numpy': lambda data, window_sizes: first_markers(
+        numpy_scan_runs([data], min(window_sizes)), window_sizes
+    ),
+    'last-seen': lambda data, window_sizes: first_markers(
+        scan_runs([data], min(window_sizes)), window_sizes
+    ),
+    'window': lambda data, window_sizes: (
+        (window_size, marker)
+        for window_size in window_sizes
+        for marker in islice(window_markers(data, window_size), 1)
+    ),
+}
+
+
+def build_parser():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '--size-mb', type=int, default=1024
+    )
+    parser.add_argument(
+        '--window-size', type=int, nargs='+', default=[4, 14]
+    )
+    parser.add_argument(
+        '--engines', nargs='+', choices=list(ENGINES),
+        default=['numpy', 'last-seen']
+    )
+    parser.add_argument(
+        '--seed', type=int, default=2022
+    )
+
+    return parser
+
+
+def make_datastream(size, window_sizes, seed):
+    # Draws from fewer symbols than the smallest window, so the only
+    #  markers are in the distinct run placed at the very end.
+    rng = np.random.default_rng(seed)
+    alphabet = np.frombuffer(b'abcdefghijklmnopqrstuvwxyz', dtype=np.uint8)
+    n_symbols = min(window_sizes) - 1
+    marker = alphabet[-max(window_sizes):]
+    data = alphabet[
+        rng.integers(0, n_symbols, size - marker.size, dtype=np.uint8)
+    ]
+
+    return np.concatenate([data, marker]).tobytes()
+
+
+def main():
+    args = build_parser().parse_args()
+    data = make_datastream(
+        args.size_mb * 2 ** 20, args.window_size, args.seed
+    )
+    print(f'{len(data) / 2 ** 20:.0f} MiB datastream')
+
+    answers = set()
+    for engine in args.engines:
+        start = perf_counter()
+        markers = dict(ENGINES[engine](data, args.window_size))
+        elapsed = perf_counter() - start
+        answers.add(tuple(sorted(markers.items())))
+        print(
+            f'{engine}: {elapsed:.2f}s, '
+            f'{len(data) / 2 ** 20 / elapsed:.1f} MiB/s, {markers}'
+        )
+    assert len(answers) == 1, answers
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,13 @@
 from argparse import ArgumentParser
-from itertools import islice
+from itertools import chain, islice
 from pathlib import Path
+import sys
+
+import numpy as np
+
+
+CHUNK_SIZE = 1 << 16
+NUMPY_BLOCK_SIZE = 1 << 24
 
 
 # https://docs.python.org/release/2.3.5/lib/itertools-example.html
@@ -20,28 +27,206 @@ def build_parser():
     parser = ArgumentParser()
     parser.add_argument(
         '-i', '--input-filename', type=Path,
-        required=True
+        required=True, help='Datastream to scan, or - for stdin'
     )
 
     parser.add_argument(
-        '--window-size', type=int, default=4
+        '--window-size', type=int, nargs='+', default=[4],
+        help='One or more window sizes, all found in a single pass'
+    )
+    parser.add_argument(
+        '--engine', choices=['last-seen', 'numpy', 'window'],
+        default='last-seen'
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help='Scan in chunks as they arrive, stopping once answered'
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=CHUNK_SIZE
+    )
+    parser.add_argument(
+        '--all', action='store_true',
+        help='Report every marker position, not just the first'
     )
 
     return parser
 
 
-def main():
-    args = build_parser().parse_args()
+class MarkerScanner:
+    # Tracks where the longest run of distinct bytes ending at each index
+    #  starts, using the last index each byte value was seen at. The state
+    #  carries over between chunks, so markers spanning a chunk boundary
+    #  are found too.
+    def __init__(self, window_size):
+        self.window_size = window_size
+        self.last_seen = [-1] * 256
+        self.run_start = 0
+        self.offset = 0
+
+    def scan(self, chunk):
+        # Yields the position just after each marker, counted from the
+        #  start of the stream.
+        last_seen = self.last_seen
+        run_start = self.run_start
+        for index, byte in enumerate(chunk, self.offset):
+            if last_seen[byte] >= run_start:
+                run_start = last_seen[byte] + 1
+            last_seen[byte] = index
+            if index - run_start + 1 >= self.window_size:
+                self.run_start = run_start
+                yield index + 1
+
+        self.run_start = run_start
+        self.offset += len(chunk)
+
+
+def stream_markers(chunks, window_size):
+    scanner = MarkerScanner(window_size)
+    for chunk in chunks:
+        yield from scanner.scan(chunk)
+
+
+def scan_runs(chunks, window_size):
+    # Each marker position along with the length of the run of distinct
+    #  bytes ending there, which may be longer than window_size.
+    scanner = MarkerScanner(window_size)
+    for chunk in chunks:
+        for position in scanner.scan(chunk):
+            yield position, position - scanner.run_start
+
+
+def numpy_scan_runs(chunks, window_size, block_size=NUMPY_BLOCK_SIZE):
+    # For each position, find where the same byte was last seen with one
+    #  array pass per byte value. The start of the run of distinct bytes
+    #  ending at each position is then a running maximum of those.
+    last_seen = np.full(256, -1, dtype=np.int64)
+    run_start = 0
+    offset = 0
+    for chunk in chunks:
+        for block_start in range(0, len(chunk), block_size):
+            block = np.frombuffer(
+                chunk[block_start:block_start + block_size], dtype=np.uint8
+            )
+            previous = np.empty(block.size, dtype=np.int64)
+            for byte in np.flatnonzero(np.bincount(block, minlength=256)):
+                indices = np.flatnonzero(block == byte)
+                previous[indices[0]] = last_seen[byte]
+                previous[indices[1:]] = indices[:-1] + offset
+                last_seen[byte] = indices[-1] + offset
+
+            run_starts = np.maximum.accumulate(previous + 1)
+            np.maximum(run_starts, run_start, out=run_starts)
+            positions = np.arange(offset + 1, offset + block.size + 1)
+            run_lengths = positions - run_starts
+            found = run_lengths >= window_size
+            yield from zip(
+                positions[found].tolist(), run_lengths[found].tolist()
+            )
 
-    window_size = args.window_size
+            run_start = int(run_starts[-1])
+            offset += block.size
 
-    with open(args.input_filename) as fd:
-        data = fd.read().strip()
 
+def first_markers(runs, window_sizes):
+    # All window sizes share one scan, keyed on the smallest. Any window
+    #  of distinct bytes ends in smaller windows of distinct bytes, so
+    #  sizes are answered smallest first, as soon as the run of distinct
+    #  bytes is long enough for them.
+    pending = sorted(set(window_sizes))
+    for position, run_length in runs:
+        while pending and pending[0] <= run_length:
+            yield pending.pop(0), position
+        if not pending:
+            return
+
+
+def all_markers(runs, window_sizes):
+    window_sizes = sorted(set(window_sizes))
+    for position, run_length in runs:
+        for window_size in window_sizes:
+            if window_size > run_length:
+                break
+            yield window_size, position
+
+
+def find_marker(data, window_size):
+    return next(stream_markers([data], window_size), None)
+
+
+def window_markers(data, window_size):
     for index, substring in enumerate(window(data, window_size)):
         if len(substring) == len(set(substring)):
-            print(index + window_size)
+            yield index + window_size
+
+
+def read_stripped_chunks(fd, chunk_size=CHUNK_SIZE):
+    # Gives the same bytes as fd.read().strip() without waiting for the
+    #  end of the stream. Trailing whitespace is held back until more data
+    #  shows that it isn't trailing.
+    held = b''
+    started = False
+    while True:
+        chunk = fd.read1(chunk_size)
+        if not chunk:
             break
+        if not started:
+            chunk = chunk.lstrip()
+            started = bool(chunk)
+
+        body = chunk.rstrip()
+        if body:
+            yield held + body
+            held = b''
+        held += chunk[len(body):]
+
+
+def open_datastream(filename):
+    if str(filename) == '-':
+        return sys.stdin.buffer
+
+    return open(filename, 'rb')
+
+
+def main():
+    args = build_parser().parse_args()
+
+    window_sizes = args.window_size
+    if args.engine == 'window' and len(window_sizes) > 1:
+        build_parser().error('the window engine takes a single window size')
+
+    with open_datastream(args.input_filename) as fd:
+        if args.stream:
+            chunks = read_stripped_chunks(fd, args.chunk_size)
+        else:
+            chunks = [fd.read().strip()]
+
+        if args.engine == 'window':
+            window_size, = window_sizes
+            markers = (
+                (window_size, marker)
+                for marker in window_markers(
+                    chain.from_iterable(chunks), window_size
+                )
+            )
+            if not args.all:
+                markers = islice(markers, 1)
+        else:
+            if args.engine == 'numpy':
+                runs = numpy_scan_runs(chunks, min(window_sizes))
+            else:
+                runs = scan_runs(chunks, min(window_sizes))
+
+            if args.all:
+                markers = all_markers(runs, window_sizes)
+            else:
+                markers = first_markers(runs, window_sizes)
+
+        for window_size, marker in markers:
+            if len(window_sizes) > 1:
+                print(f'{window_size}: {marker}', flush=True)
+            else:
+                print(marker, flush=True)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,247 @@
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import os
+import random
+import subprocess
+import sys
+
+from part1 import (
+    CompactMachine, Machine, SIZE_THRESHOLD, configure_trace, read_commands,
+    stream_directory_sizes
+)
+from part2 import TOTAL_DISK_SPACE, UNUSED_SPACE_REQUIRED
+
+
+MACHINES = {
+    'objects': Machine,
+    'compact': CompactMachine,
+}
+
+
+def build_parser():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '--n-nodes', type=int, default=1000000
+    )
+    parser.add_argument(
+        '--depth', type=int, default=10000
+    )
+    parser.add_argument(
+        '--dir-fraction', type=float, default=0.1
+    )
+    parser.add_argument(
+        '--seed', type=int, default=2022
+    )
+    parser.add_argument(
+        '--rss-child', choices=list(MACHINES),
+        help='Internal: build one representation and report its RSS'
+    )
+    parser.add_argument(
+        '--transcript', type=Path
+    )
+
+    return parser
+
+
+def make_tree(n_nodes, depth, dir_fraction, seed):
+    # A chain of depth directories, with the other nodes hung off randomly
+    #  chosen directories. Returns each directory's child directories and
+    #  file sizes.
+    rng = random.Random(seed)
+    subdirectories = [[] for _ in range(depth)]
+    files = [[] for _ in range(depth)]
+    for index in range(1, depth):
+        subdirectories[index - 1].append(index)
+
+    for _ in range(n_nodes - depth):
+        parent = rng.randrange(len(subdirectories))
+        if rng.random() < dir_fraction:
+            subdirectories[parent].append(len(subdirectories))
+            subdirectories.append([])
+            files.append([])
+        else:
+            files[parent].append(rng.randint(1, 300000))
+
+    return subdirectories, files
+
+
+def write_transcript(filename, subdirectories, files):
+    with open(filename, 'w') as fd:
+        pending = [(0, 'cd /')]
+        while pending:
+            directory, command = pending.pop()
+            fd.write(f'$ {command}\n')
+            if directory is None:
+                continue
+
+            fd.write('$ ls\n')
+            for child in subdirectories[directory]:
+                fd.write(f'dir d{child}\n')
+            for index, size in enumerate(files[directory]):
+                fd.write(f'{size} f{index}.txt\n')
+
+            for child in reversed(subdirectories[directory]):
+                pending.append((None, 'cd ..'))
+                pending.append((child, f'cd d{child}'))
+
+
+def trace_transcript(filename, machine_class=Machine):
+    all_directories = set()
+    machine = machine_class()
+    with open(filename) as fd:
+        for command, output_lines in read_commands(fd):
+            machine.trace(command, output_lines)
+            all_directories.add(machine.working_directory)
+    machine.flush()
+
+    return machine, all_directories
+
+
+def stream_part1_answer(filename):
+    with open(filename) as fd:
+        return sum(
+            size
+            for _, size in stream_directory_sizes(read_commands(fd))
+            if size <= SIZE_THRESHOLD
+        )
+
+
+def current_rss():
+    # In kilobytes. ru_maxrss would do, but a child starts with its
+    #  parent's peak, so read the live figure from /proc instead (Linux).
+    with open('/proc/self/status') as fd:
+        for line in fd:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+
+
+def report_rss(representation, transcript):
+    # The tree is still alive when measured, so the growth is its size
+    before = current_rss()
+    machine, all_directories = trace_transcript(
+        transcript, MACHINES[representation]
+    )
+    print((current_rss() - before) / 1024)
+
+
+def measure_rss(representation, transcript):
+    # Each representation is built in a fresh process, so neither sees
+    #  the other's peak.
+    output = subprocess.run(
+        [
+            sys.executable, __file__,
+            '--rss-child', representation, '--transcript', transcript
+        ],
+        stdout=subprocess.PIPE, check=True
+    ).stdout
+
+    return float(output)
+
+
+def part1_answer(all_directories):
+    return sum(
+        directory.size
+        for directory in all_directories
+        if directory.size <= SIZE_THRESHOLD
+    )
+
+
+def part2_answer(all_directories):
+    filesystem_size = max(directory.size for directory in all_directories)
+    extra_space_required = (
+        UNUSED_SPACE_REQUIRED - (TOTAL_DISK_SPACE - filesystem_size)
+    )
+    directories_by_size = sorted(
+        all_directories,
+        key=lambda directory: directory.size
+    )
+    for directory in directories_by_size:
+        if directory.size >= extra_space_required:
+            return directory.size
+
+
+def expected_sizes(subdirectories, files):
+    # Reference totals, summed children first without recursion
+    totals = [sum(sizes) for sizes in files]
+    order = [0]
+    for directory in order:
+        order.extend(subdirectories[directory])
+    for directory in reversed(order):
+        for child in subdirectories[directory]:
+            totals[directory] += totals[child]
+
+    return totals
+
+
+def timed(function, *args):
+    start = perf_counter()
+    result = function(*args)
+
+    return perf_counter() - start, result
+
+
+def main():
+    args = build_parser().parse_args()
+    if args.rss_child:
+        report_rss(args.rss_child, args.transcript)
+        return
+
+    subdirectories, files = make_tree(
+        args.n_nodes, args.depth, args.dir_fraction, args.seed
+    )
+    totals = expected_sizes(subdirectories, files)
+
+    with TemporaryDirectory() as directory:
+        filename = Path(directory) / 'transcript.txt'
+        write_transcript(filename, subdirectories, files)
+        print(
+            f'{args.n_nodes} nodes, {len(subdirectories)} directories, '
+            f'depth {args.depth}'
+        )
+
+        answers = set()
+        for representation, machine_class in MACHINES.items():
+            elapsed, (_, all_directories) = timed(
+                trace_transcript, filename, machine_class
+            )
+            print(f'{representation} trace: {elapsed:.2f}s')
+
+            for directory in all_directories:
+                index = 0 if directory.name == '/' else int(directory.name[1:])
+                assert directory.size == totals[index], directory.name
+
+            results = []
+            for name, answer in [
+                ('part1', part1_answer), ('part2', part2_answer)
+            ]:
+                elapsed, result = timed(answer, all_directories)
+                results.append(result)
+                print(
+                    f'{representation} {name} queries: {elapsed:.3f}s, '
+                    f'answer {result}'
+                )
+            answers.add(tuple(results))
+
+            tree_rss = measure_rss(representation, filename)
+            print(f'{representation} tree RSS: {tree_rss:.1f} MiB')
+
+        assert len(answers) == 1, answers
+
+        elapsed, result = timed(stream_part1_answer, filename)
+        print(f'stream part1: {elapsed:.2f}s, answer {result}')
+        (expected, _), = answers
+        assert result == expected, result
+
+        with open(filename) as fd:
+            n_lines = sum(1 for _ in fd)
+        elapsed, _ = timed(trace_transcript, filename)
+        print(f'trace off: {n_lines / elapsed:,.0f} lines/s')
+        configure_trace(os.devnull)
+        elapsed, _ = timed(trace_transcript, filename)
+        print(f'trace on: {n_lines / elapsed:,.0f} lines/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,36 @@
 from abc import ABC, abstractmethod
 from argparse import ArgumentParser
+from array import array
 from itertools import islice
+from logging.handlers import MemoryHandler
 from pathlib import Path
+import logging
+import sys
 
 
 TOTAL_DISK_SPACE = 70000000
 UNUSED_SPACE_REQUIRED = 30000000
+TRACE_BUFFER_SIZE = 4096
+
+# Silent unless configure_trace is called
+logger = logging.getLogger('day_07.trace')
+logger.setLevel(logging.WARNING)
+logger.propagate = False
+
+
+def configure_trace(trace_filename=None):
+    # Trace records are held in a buffer and written to the sink in
+    #  batches, rather than a write per command.
+    if trace_filename:
+        sink = logging.FileHandler(trace_filename, mode='w')
+    else:
+        sink = logging.StreamHandler(sys.stderr)
+    sink.setFormatter(logging.Formatter('%(message)s'))
+
+    logger.addHandler(MemoryHandler(
+        TRACE_BUFFER_SIZE, flushLevel=logging.ERROR, target=sink
+    ))
+    logger.setLevel(logging.DEBUG)
 
 
 class FileSystemNode(ABC):
@@ -14,17 +39,39 @@ class FileSystemNode(ABC):
         pass
 
 class Directory(FileSystemNode):
+    # Sizes are kept as running totals rather than re-summed on every read.
+    #  Growth is passed to the parent lazily, via propagate, so adding a
+    #  file is O(1) however deep it is. Every directory off the working path
+    #  is exact, and Machine.flush settles the rest.
     def __init__(self, name):
         self.name = name
         self.children = dict()
+        self.parent = None
+        self._size = 0
+        self._unpropagated = 0
 
     def add_child(self, child):
+        if child.name in self.children:
+            return
+
         self.children[child.name] = child
         child.parent = self
+        if isinstance(child, Directory):
+            child._unpropagated = 0
+        self.grow(child.size)
+
+    def grow(self, size):
+        self._size += size
+        self._unpropagated += size
+
+    def propagate(self):
+        if self.parent is not None and self._unpropagated:
+            self.parent.grow(self._unpropagated)
+        self._unpropagated = 0
 
     @property
     def size(self):
-        return sum(child.size for child in self.children.values())
+        return self._size
 
 
 class File(FileSystemNode):
@@ -46,10 +93,18 @@ class Machine:
         if not self.working_directory:
             self.working_directory = Directory(destination)
         elif destination == '..':
+            self.working_directory.propagate()
             self.working_directory = self.working_directory.parent
         else:
             self.working_directory = self.working_directory.children[destination]
 
+    def flush(self):
+        # Push sizes still held along the working path up to the root
+        directory = self.working_directory
+        while directory is not None:
+            directory.propagate()
+            directory = directory.parent
+
     @staticmethod
     def make_fs_node(line):
         if line.startswith('dir'):
@@ -61,16 +116,177 @@ class Machine:
         return File(filename, int(size))
 
     def trace(self, command, output_lines=None):
-        print(command)
-        print(output_lines)
-        print()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s\n%s\n', command, output_lines)
         if command.startswith('cd'):
             _, dest_directory = command.split()
             self.cd(dest_directory)
 
         for line in output_lines:
-            node = self.make_fs_node(line)
-            self.working_directory.add_child(node)
+            self.add_entry(line)
+
+    def add_entry(self, line):
+        node = self.make_fs_node(line)
+        self.working_directory.add_child(node)
+
+
+class CompactTree:
+    # Nodes are rows of parallel arrays rather than objects. Names share
+    #  one byte pool, node i's name running from name_offsets[i] to
+    #  name_offsets[i + 1]. Children are always added after their parents.
+    def __init__(self):
+        self.parents = array('q')
+        self.sizes = array('q')
+        self.name_offsets = array('q', [0])
+        self.names = bytearray()
+        self.directory_flags = bytearray()
+        self.totalled = False
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add_node(self, parent, name, size=0, is_directory=False):
+        self.parents.append(parent)
+        self.sizes.append(size)
+        self.names += name.encode()
+        self.name_offsets.append(len(self.names))
+        self.directory_flags.append(is_directory)
+
+        return len(self.parents) - 1
+
+    def name(self, index):
+        start, end = self.name_offsets[index], self.name_offsets[index + 1]
+
+        return self.names[start:end].decode()
+
+    def total_sizes(self):
+        # As parents come before children, one reverse pass adds every
+        #  node into its parent after its own total is complete.
+        if self.totalled:
+            return
+        parents, sizes = self.parents, self.sizes
+        for index in range(len(parents) - 1, 0, -1):
+            sizes[parents[index]] += sizes[index]
+        self.totalled = True
+
+
+class CompactDirectory:
+    # A lightweight view of a directory in a CompactTree
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def name(self):
+        return self.tree.name(self.index)
+
+    @property
+    def size(self):
+        return self.tree.sizes[self.index]
+
+    def __eq__(self, other):
+        return self.tree is other.tree and self.index == other.index
+
+    def __hash__(self):
+        return hash(self.index)
+
+
+class CompactMachine(Machine):
+    def __init__(self):
+        self.tree = CompactTree()
+        self.working_index = None
+        self.subdirectories = dict()
+        self.listed = set()
+
+    @property
+    def working_directory(self):
+        if self.working_index is None:
+            return None
+
+        return CompactDirectory(self.tree, self.working_index)
+
+    def cd(self, destination):
+        if self.working_index is None:
+            self.working_index = self.tree.add_node(
+                -1, destination, is_directory=True
+            )
+        elif destination == '..':
+            self.working_index = self.tree.parents[self.working_index]
+        else:
+            self.working_index = self.subdirectories[
+                self.working_index, destination
+            ]
+
+    def flush(self):
+        self.tree.total_sizes()
+
+    def add_entry(self, line):
+        size_or_dir, name = line.split()
+        if size_or_dir == 'dir':
+            self.subdirectories[self.working_index, name] = (
+                self.tree.add_node(self.working_index, name, is_directory=True)
+            )
+        else:
+            self.tree.add_node(self.working_index, name, int(size_or_dir))
+
+    def trace(self, command, output_lines=None):
+        # Listing a directory twice would otherwise add its nodes twice
+        if command == 'ls':
+            if self.working_index in self.listed:
+                output_lines = []
+            self.listed.add(self.working_index)
+
+        super().trace(command, output_lines)
+
+
+def read_commands(fd):
+    # Pairs each '$ ' command with the output lines that follow it, reading
+    #  line by line so only one command's output is held at a time.
+    command, output_lines = None, []
+    for line in fd:
+        line = line.rstrip('\n')
+        if line.startswith('$ '):
+            if command is not None:
+                yield command, output_lines
+            command, output_lines = line[2:], []
+        elif line:
+            output_lines.append(line)
+
+    if command is not None:
+        yield command, output_lines
+
+
+def stream_directory_sizes(commands):
+    # Keeps only a [name, size] entry per directory on the working path.
+    #  A directory's total is complete once it's left, so it's yielded
+    #  then and added into its parent. Assumes each directory is entered
+    #  once, as in a depth first walk.
+    path = []
+    for command, output_lines in commands:
+        if command.startswith('cd'):
+            _, destination = command.split()
+            if destination == '..':
+                name, size = path.pop()
+                path[-1][1] += size
+                yield name, size
+            elif destination == '/' and path:
+                while len(path) > 1:
+                    name, size = path.pop()
+                    path[-1][1] += size
+                    yield name, size
+            else:
+                path.append([destination, 0])
+        else:
+            for line in output_lines:
+                size_or_dir, _ = line.split()
+                if size_or_dir != 'dir':
+                    path[-1][1] += int(size_or_dir)
+
+    while path:
+        name, size = path.pop()
+        if path:
+            path[-1][1] += size
+        yield name, size
 
 
 def build_parser():
@@ -80,31 +296,54 @@ def build_parser():
         required=True
     )
 
+    parser.add_argument(
+        '--compact', action='store_true',
+        help='Build the tree as parallel arrays instead of node objects'
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help='Total directories as they close, without building a tree'
+    )
+    parser.add_argument(
+        '--trace', action='store_true',
+        help='Log each command and its output'
+    )
+    parser.add_argument(
+        '--trace-filename', type=Path,
+        help='Where to write the trace, stderr by default'
+    )
+
     return parser
 
 
 def main():
     args = build_parser().parse_args()
+    if args.trace or args.trace_filename:
+        configure_trace(args.trace_filename)
+
+    if args.stream:
+        # Only the totals are kept, the root's arriving last
+        with open(args.input_filename) as fd:
+            directory_sizes = list(
+                stream_directory_sizes(read_commands(fd))
+            )
+        _, filesystem_size = directory_sizes[-1]
+    else:
+        all_directories = set()
+
+        machine = CompactMachine() if args.compact else Machine()
+        with open(args.input_filename) as fd:
+            for command, output_lines in read_commands(fd):
+                machine.trace(command, output_lines)
+                all_directories.add(machine.working_directory)
+        machine.flush()
+
+        directory_sizes = [
+            (directory.name, directory.size)
+            for directory in all_directories
+        ]
+        filesystem_size = max(size for _, size in directory_sizes)
 
-    with open(args.input_filename) as fd:
-        data = fd.read()
-
-    # Get each command with lines of its output
-    commands_with_outputs = [
-        command.strip().splitlines()
-        for command in data.split('$')
-        if command
-    ]
-
-    all_directories = set()
-
-    machine = Machine()
-    for entry in commands_with_outputs:
-        command, *output_lines = entry
-        machine.trace(command, output_lines)
-        all_directories.add(machine.working_directory)
-
-    filesystem_size = max(directory.size for directory in all_directories)
     size_remaining = TOTAL_DISK_SPACE - filesystem_size
 
     extra_space_required = UNUSED_SPACE_REQUIRED - size_remaining
@@ -112,13 +351,13 @@ def main():
     print(f'Size remaining is {size_remaining}')
     print(f'Extra required is {extra_space_required}')
     directories_by_size = sorted(
-        all_directories,
-        key=lambda directory: directory.size
+        directory_sizes,
+        key=lambda name_and_size: name_and_size[1]
     )
-    for directory in directories_by_size:
-        if directory.size >= extra_space_required:
-            print(directory.size)
-            print(directory.name)
+    for name, size in directories_by_size:
+        if size >= extra_space_required:
+            print(size)
+            print(name)
             break
 
 
@@ -0,0 +1,277 @@
+from argparse import ArgumentParser
+from pathlib import Path
+import sys
+
+import numpy as np
+
+from part1 import CompactMachine, read_commands
+from part2 import TOTAL_DISK_SPACE, UNUSED_SPACE_REQUIRED
+
+
+def build_parser():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '-i', '--input-filename', type=Path,
+        help='Transcript to index, otherwise --index-directory is loaded'
+    )
+    parser.add_argument(
+        '--index-directory', type=Path,
+        help='Where to save a built index, or load one from'
+    )
+    parser.add_argument(
+        '-q', '--queries-filename', type=Path,
+        help=(
+            'One query per line: needed, smallest N, top N or size PATH. '
+            'Reads stdin if not given'
+        )
+    )
+
+    return parser
+
+
+class DiskUsageIndex:
+    # Directories only, numbered in post-order so the root comes last and
+    #  every subtree is a contiguous run ending at its own directory. Each
+    #  distinct name is stored once, and children are kept per parent in
+    #  name order so a path resolves with one binary search per component.
+    #  Arrays are saved as .npy files so they can be memory mapped back.
+    ARRAY_NAMES = [
+        'parents', 'sizes', 'name_ids', 'names', 'name_offsets',
+        'child_offsets', 'children', 'child_name_ids',
+        'by_size', 'sorted_sizes'
+    ]
+
+    def __init__(
+            self, parents, sizes, name_ids, names, name_offsets,
+            child_offsets, children, child_name_ids,
+            by_size, sorted_sizes):
+
+        self.parents = parents
+        self.sizes = sizes
+
+        self.name_ids = name_ids
+        self.names = names
+        self.name_offsets = name_offsets
+
+        self.child_offsets = child_offsets
+        self.children = children
+        self.child_name_ids = child_name_ids
+
+        self.by_size = by_size
+        self.sorted_sizes = sorted_sizes
+
+    def __len__(self):
+        return len(self.sizes)
+
+    @classmethod
+    def from_tree(cls, tree):
+        tree.total_sizes()
+        is_directory = np.frombuffer(tree.directory_flags, dtype=np.uint8)
+        directories = np.flatnonzero(is_directory)
+        tree_parents = np.frombuffer(tree.parents, dtype=np.int64)
+
+        tree_children = {directory: [] for directory in directories.tolist()}
+        for directory in directories[1:].tolist():
+            tree_children[tree_parents[directory]].append(directory)
+
+        # Reversing a pre-order walk puts every directory after all of its
+        #  descendants, which is a post-order.
+        pre_order = []
+        pending = [int(directories[0])] if directories.size else []
+        while pending:
+            directory = pending.pop()
+            pre_order.append(directory)
+            pending.extend(tree_children[directory])
+        post_order = np.array(pre_order[::-1], dtype=np.int64)
+
+        renumbered = np.full(len(tree), -1, dtype=np.int64)
+        renumbered[post_order] = np.arange(post_order.size)
+        parents = np.where(
+            tree_parents[post_order] == -1, -1,
+            renumbered[tree_parents[post_order]]
+        )
+        sizes = np.frombuffer(tree.sizes, dtype=np.int64)[post_order]
+
+        node_names = [tree.name(directory) for directory in post_order]
+        unique_names = sorted(set(node_names))
+        name_to_id = {name: index for index, name in enumerate(unique_names)}
+        name_ids = np.array(
+            [name_to_id[name] for name in node_names], dtype=np.int64
+        )
+        encoded = [name.encode() for name in unique_names]
+        names = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        name_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        name_offsets[1:] = np.cumsum([len(name) for name in encoded])
+
+        # Children grouped by parent, then by name within each parent
+        has_parent = np.flatnonzero(parents != -1)
+        child_order = np.lexsort(
+            (name_ids[has_parent], parents[has_parent])
+        )
+        children = has_parent[child_order]
+        child_offsets = np.zeros(post_order.size + 1, dtype=np.int64)
+        child_offsets[1:] = np.cumsum(
+            np.bincount(parents[children], minlength=post_order.size)
+        )
+
+        by_size = np.argsort(sizes, kind='stable')
+
+        return cls(
+            parents, sizes, name_ids, names, name_offsets,
+            child_offsets, children, name_ids[children],
+            by_size, sizes[by_size]
+        )
+
+    @classmethod
+    def from_transcript(cls, fd):
+        machine = CompactMachine()
+        for command, output_lines in read_commands(fd):
+            machine.trace(command, output_lines)
+        machine.flush()
+
+        return cls.from_tree(machine.tree)
+
+    @classmethod
+    def load(cls, directory):
+        return cls(**{
+            name: np.load(directory / f'{name}.npy', mmap_mode='r')
+            for name in cls.ARRAY_NAMES
+        })
+
+    def save(self, directory):
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in self.ARRAY_NAMES:
+            np.save(directory / f'{name}.npy', getattr(self, name))
+
+    def name(self, name_id):
+        start, end = self.name_offsets[name_id], self.name_offsets[name_id + 1]
+
+        return self.names[start:end].tobytes().decode()
+
+    def find_name(self, name):
+        # Names are sorted, so bisect the pool rather than build a dict
+        encoded = name.encode()
+        low, high = 0, len(self.name_offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            start, end = (
+                self.name_offsets[middle], self.name_offsets[middle + 1]
+            )
+            if self.names[start:end].tobytes() < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self.name_offsets) - 1 and self.name(low) == name:
+            return low
+
+        return None
+
+    def path(self, directory):
+        components = []
+        while self.parents[directory] != -1:
+            components.append(self.name(self.name_ids[directory]))
+            directory = self.parents[directory]
+
+        return '/' + '/'.join(reversed(components))
+
+    def resolve(self, path):
+        if not len(self):
+            return None
+        directory = len(self) - 1
+        for component in path.strip('/').split('/'):
+            if not component:
+                continue
+            name_id = self.find_name(component)
+            if name_id is None:
+                return None
+            start = self.child_offsets[directory]
+            stop = self.child_offsets[directory + 1]
+            position = start + np.searchsorted(
+                self.child_name_ids[start:stop], name_id
+            )
+            if position == stop or self.child_name_ids[position] != name_id:
+                return None
+            directory = self.children[position]
+
+        return directory
+
+    def subtree_size(self, path):
+        directory = self.resolve(path)
+        if directory is None:
+            return None
+
+        return int(self.sizes[directory])
+
+    def smallest_at_least(self, size):
+        position = np.searchsorted(self.sorted_sizes, size, side='left')
+        if position == len(self.sorted_sizes):
+            return None
+
+        return int(self.by_size[position])
+
+    def largest(self, n):
+        n = min(n, len(self))
+
+        return self.by_size[len(self) - n:][::-1].tolist()
+
+    def extra_space_required(self):
+        filesystem_size = int(self.sizes[-1])
+
+        return UNUSED_SPACE_REQUIRED - (TOTAL_DISK_SPACE - filesystem_size)
+
+
+def describe(index, directory):
+    return f'{index.path(directory)}={index.sizes[directory]}'
+
+
+def answer(index, query):
+    kind, _, argument = query.partition(' ')
+    if kind == 'size':
+        size = index.subtree_size(argument or '/')
+        return 'not found' if size is None else str(size)
+    if kind == 'top':
+        return ' '.join(
+            describe(index, directory)
+            for directory in index.largest(int(argument))
+        )
+    if kind == 'needed':
+        size = index.extra_space_required()
+    elif kind == 'smallest':
+        size = int(argument)
+    else:
+        return 'unknown query'
+
+    directory = index.smallest_at_least(size)
+    if directory is None:
+        return 'none'
+
+    return describe(index, directory)
+
+
+def main():
+    args = build_parser().parse_args()
+
+    if args.input_filename:
+        with open(args.input_filename) as fd:
+            index = DiskUsageIndex.from_transcript(fd)
+        if args.index_directory:
+            index.save(args.index_directory)
+    elif args.index_directory:
+        index = DiskUsageIndex.load(args.index_directory)
+    else:
+        build_parser().error('one of -i or --index-directory is required')
+
+    if args.queries_filename:
+        fd = open(args.queries_filename)
+    else:
+        fd = sys.stdin
+
+    with fd:
+        for line in fd:
+            query = line.strip()
+            if query:
+                print(f'{query}: {answer(index, query)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+from argparse import ArgumentParser
+from time import perf_counter
+
+import numpy as np
+
+from part1 import (
+    grid_visibility, load_grid, numpy_visibility, string_to_integer_list
+)
+from part2 import (
+    batched_scenic_scores, get_scenic_score, grid_scenic_scores,
+    stack_scenic_score
+)
+
+
+def integer_grid(data):
+    return [string_to_integer_list(line) for line in data.split()]
+
+
+ENGINES = {
+    'part1': {
+        'numpy': lambda data: int(numpy_visibility(load_grid(data)).sum()),
+        'python': lambda data: sum(
+            sum(row) for row in grid_visibility(integer_grid(data))
+        ),
+    },
+    'part2': {
+        'numpy': lambda data: int(
+            batched_scenic_scores(load_grid(data)).max()
+        ),
+        'stack': lambda data: max(
+            max(row)
+            for row in grid_scenic_scores(
+                integer_grid(data), stack_scenic_score
+            )
+        ),
+        'walk': lambda data: max(
+            max(row)
+            for row in grid_scenic_scores(
+                integer_grid(data), get_scenic_score
+            )
+        ),
+    },
+}
+DEFAULT_ENGINES = {
+    'part1': ['numpy', 'python'],
+    'part2': ['numpy', 'stack'],
+}
+
+
+def build_parser():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '--size', type=int, default=10000
+    )
+    parser.add_argument(
+        '--part', choices=list(ENGINES), default='part1'
+    )
+    parser.add_argument(
+        '--engines', nargs='+',
+        choices=sorted(set().union(*ENGINES.values())),
+        help='Defaults to every engine but walk for the chosen part'
+    )
+    parser.add_argument(
+        '--seed', type=int, default=2022
+    )
+
+    return parser
+
+
+def make_forest(size, seed):
+    # Square, as the puzzle input is, with one line of digits per row
+    rng = np.random.default_rng(seed)
+    heights = rng.integers(0, 10, (size, size), dtype=np.uint8) + ord('0')
+    newlines = np.full((size, 1), ord('\n'), dtype=np.uint8)
+
+    return np.hstack([heights, newlines]).tobytes().decode()
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    engines = args.engines or DEFAULT_ENGINES[args.part]
+    for engine in engines:
+        if engine not in ENGINES[args.part]:
+            parser.error(f'{args.part} has no {engine} engine')
+
+    data = make_forest(args.size, args.seed)
+    print(f'{args.size}x{args.size} forest')
+
+    answers = set()
+    for engine in engines:
+        start = perf_counter()
+        answer = ENGINES[args.part][engine](data)
+        elapsed = perf_counter() - start
+        answers.add(answer)
+        print(
+            f'{engine}: {elapsed:.2f}s, '
+            f'{args.size ** 2 / elapsed / 1e6:.1f}M trees/s, '
+            f'answer {answer}'
+        )
+    assert len(answers) == 1, answers
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,8 @@
 from argparse import ArgumentParser
-from copy import deepcopy
 from pathlib import Path
 
+import numpy as np
+
 
 def build_parser():
     parser = ArgumentParser()
@@ -9,6 +10,9 @@ def build_parser():
         '-i', '--input-filename', type=Path,
         required=True
     )
+    parser.add_argument(
+        '--engine', choices=['python', 'numpy'], default='python'
+    )
 
     return parser
 
@@ -18,23 +22,51 @@ def string_to_integer_list(string):
 
 
 def get_visibility(sequence):
+    # A tree is visible from one end if it's taller than the running
+    #  maximum from that end, so one pass each way covers both sides.
     visible = [False] * len(sequence)
-    for index, element in enumerate(sequence):
-        left, right = sequence[:index], sequence[index + 1:]
-        edge = not left or not right
-        if edge:
-            visible[index] = True
-            continue
-
-        taller_than_tallest_on_atleast_one_side = (
-            element > min(max(left), max(right))
-        )
-        visible[index] = edge or taller_than_tallest_on_atleast_one_side
+    for indices in [range(len(sequence)), reversed(range(len(sequence)))]:
+        tallest = -1
+        for index in indices:
+            element = sequence[index]
+            if element > tallest:
+                visible[index] = True
+                tallest = element
     return visible
 
 
-def transpose(matrix):
-    return list(zip(*matrix))
+def grid_visibility(grid):
+    # Rows are scanned in place and columns read out one at a time, so
+    #  neither the grid nor the visibility needs transposing or copying.
+    visibility = [get_visibility(row) for row in grid]
+    for col_index in range(len(grid[0]) if grid else 0):
+        column = [row[col_index] for row in grid]
+        for row_index, visible in enumerate(get_visibility(column)):
+            if visible:
+                visibility[row_index][col_index] = True
+    return visibility
+
+
+def load_grid(data):
+    # One byte per tree, with the newline column sliced off
+    lines = data.encode().split()
+    heights = np.frombuffer(b''.join(lines), dtype=np.uint8) - ord('0')
+
+    return heights.reshape(len(lines), -1)
+
+
+def numpy_visibility(grid):
+    # The same running maxima, taken down rows and columns in both
+    #  directions by viewing the arrays transposed and reversed.
+    visible = np.zeros(grid.shape, dtype=bool)
+    for lines, visible_lines in [(grid, visible), (grid.T, visible.T)]:
+        for lines, visible_lines in [
+            (lines, visible_lines), (lines[::-1], visible_lines[::-1])
+        ]:
+            tallest = np.maximum.accumulate(lines, axis=0)
+            visible_lines[0] = True
+            visible_lines[1:] |= lines[1:] > tallest[:-1]
+    return visible
 
 
 def main():
@@ -43,6 +75,10 @@ def main():
     with open(args.input_filename) as fd:
         data = fd.read()
 
+    if args.engine == 'numpy':
+        print(numpy_visibility(load_grid(data)).sum())
+        return
+
     lines = data.splitlines()
 
     grid = [
@@ -50,23 +86,7 @@ def main():
         for line in lines
     ]
 
-    row_visibility = [
-        get_visibility(row)
-        for row in grid
-    ]
-
-    column_visibility = transpose([
-        get_visibility(column)
-        for column in transpose(grid)
-    ])
-
-    total_visibility = deepcopy(row_visibility)
-    for row_index in range(len(column_visibility)):
-        for col_index in range(len(column_visibility)):
-            total_visibility[row_index][col_index] = (
-                row_visibility[row_index][col_index] or
-                column_visibility[row_index][col_index]
-            )
+    total_visibility = grid_visibility(grid)
     print(sum(sum(row) for row in total_visibility))
 
 
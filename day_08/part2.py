@@ -1,7 +1,8 @@
 from argparse import ArgumentParser
-from copy import deepcopy
 from pathlib import Path
 
+import numpy as np
+
 
 def build_parser():
     parser = ArgumentParser()
@@ -9,6 +10,9 @@ def build_parser():
         '-i', '--input-filename', type=Path,
         required=True
     )
+    parser.add_argument(
+        '--engine', choices=['walk', 'stack', 'numpy'], default='stack'
+    )
 
     return parser
 
@@ -43,8 +47,102 @@ def get_scenic_score(sequence):
     return scenic_score
 
 
-def transpose(matrix):
-    return list(zip(*matrix))
+def stack_viewing_distances(sequence, indices):
+    # Walks sequence in the order of indices, keeping a stack of trees
+    #  that could still block the view, strictly decreasing in height. A
+    #  shorter or equal tree is hidden behind the new one for everything
+    #  further along, so each tree is pushed and popped at most once.
+    distances = [0] * len(sequence)
+    stack = []
+    for steps, index in enumerate(indices):
+        element = sequence[index]
+        while stack and sequence[stack[-1]] < element:
+            stack.pop()
+        if stack:
+            distances[index] = abs(index - stack[-1])
+            if sequence[stack[-1]] == element:
+                stack.pop()
+        else:
+            distances[index] = steps
+        stack.append(index)
+    return distances
+
+
+def stack_scenic_score(sequence):
+    left = stack_viewing_distances(sequence, range(len(sequence)))
+    right = stack_viewing_distances(
+        sequence, reversed(range(len(sequence)))
+    )
+    return [
+        score_left * score_right
+        for score_left, score_right in zip(left, right)
+    ]
+
+
+def grid_scenic_scores(grid, scenic_score=get_scenic_score):
+    # Rows are scored in place and columns read out one at a time, so
+    #  neither the grid nor the scores need transposing or copying.
+    scores = [scenic_score(row) for row in grid]
+    for col_index in range(len(grid[0]) if grid else 0):
+        column = [row[col_index] for row in grid]
+        for row_index, score in enumerate(scenic_score(column)):
+            scores[row_index][col_index] *= score
+    return scores
+
+
+def load_grid(data):
+    # One byte per tree, with the newline column sliced off
+    lines = data.encode().split()
+    heights = np.frombuffer(b''.join(lines), dtype=np.uint8) - ord('0')
+
+    return heights.reshape(len(lines), -1)
+
+
+def batched_viewing_distances(lines):
+    # stack_viewing_distances along every row of lines at once, stepping
+    #  through positions and keeping one stack per row. The stacks are
+    #  strictly decreasing, so none holds more than one tree per height.
+    n_lines, length = lines.shape
+    capacity = int(lines.max()) + 1 if lines.size else 0
+    stack_heights = np.zeros((n_lines, capacity), dtype=lines.dtype)
+    stack_indices = np.zeros((n_lines, capacity), dtype=np.int32)
+    depths = np.zeros(n_lines, dtype=np.int64)
+    rows = np.arange(n_lines)
+
+    distances = np.zeros(lines.shape, dtype=np.int32)
+    for position in range(length):
+        heights = lines[:, position]
+        while True:
+            shorter = (depths > 0) & (
+                stack_heights[rows, depths - 1] < heights
+            )
+            if not shorter.any():
+                break
+            depths -= shorter
+
+        blocked = depths > 0
+        distances[:, position] = np.where(
+            blocked, position - stack_indices[rows, depths - 1], position
+        )
+        depths -= blocked & (stack_heights[rows, depths - 1] == heights)
+
+        stack_heights[rows, depths] = heights
+        stack_indices[rows, depths] = position
+        depths += 1
+    return distances
+
+
+def batched_scenic_scores(grid):
+    # Columns are copied out as rows so each step reads contiguous memory
+    scores = np.ones(grid.shape, dtype=np.int64)
+    for lines, scores_lines in [
+        (grid, scores), (np.ascontiguousarray(grid.T), scores.T)
+    ]:
+        scores_lines *= batched_viewing_distances(lines)
+        scores_lines[:, ::-1] *= batched_viewing_distances(
+            np.ascontiguousarray(lines[:, ::-1])
+        )
+    return scores
 
 
 def main():
@@ -53,6 +151,10 @@ def main():
     with open(args.input_filename) as fd:
         data = fd.read()
 
+    if args.engine == 'numpy':
+        print(batched_scenic_scores(load_grid(data)).max())
+        return
+
     lines = data.splitlines()
 
     grid = [
@@ -60,23 +162,10 @@ def main():
         for line in lines
     ]
 
-    row_scenic_score = [
-        get_scenic_score(row)
-        for row in grid
-    ]
-
-    column_scenic_score = transpose([
-        get_scenic_score(column)
-        for column in transpose(grid)
-    ])
-
-    total_scenic_score = deepcopy(row_scenic_score)
-    for row_index in range(len(column_scenic_score)):
-        for col_index in range(len(column_scenic_score)):
-            total_scenic_score[row_index][col_index] = (
-                row_scenic_score[row_index][col_index] *
-                column_scenic_score[row_index][col_index]
-            )
+    if args.engine == 'stack':
+        total_scenic_score = grid_scenic_scores(grid, stack_scenic_score)
+    else:
+        total_scenic_score = grid_scenic_scores(grid)
     print(max(max(row) for row in total_scenic_score))
 
 